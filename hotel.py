@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os
 import plotly.graph_objects as go
 import plotly.express as px
 import warnings
@@ -9,18 +10,73 @@ warnings.filterwarnings('ignore')
 st.set_page_config(page_title="Hotel Booking Dashboard", page_icon="🏨", layout="wide")
 st.title("🏨 Hotel Booking Cancellation Dashboard")
 
+month_order = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+
+def read_bookings(csv_path='data/hotel_bookings.csv', parquet_path='data/hotel_bookings_csv.parquet'):
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        return pd.read_parquet(parquet_path)
+    
+    try:
+        df = pd.read_csv(csv_path, engine='pyarrow')
+    except ImportError:
+        df = pd.read_csv(csv_path)
+    
+    try:
+        df.to_parquet(parquet_path, compression='zstd')
+    except (ImportError, OSError):
+        pass
+    
+    return df
+
+def clean_bookings(df):
+    df = df.rename(columns={
+        'hotel': 'hotel_type',
+        'arrival_date_month': 'arrival_month',
+    })
+    
+    if 'is_canceled' in df.columns and 'lead_time' in df.columns and 'adr' in df.columns:
+        df = df.dropna(subset=['is_canceled', 'lead_time', 'adr'])
+    
+    downcast = {
+        'lead_time': 'int16',
+        'is_canceled': 'int8',
+        'adr': 'float32',
+        'stays_in_weekend_nights': 'int8',
+        'stays_in_week_nights': 'int8',
+        'adults': 'int8',
+        'babies': 'int8',
+        'total_of_special_requests': 'int8',
+        'booking_changes': 'int8',
+        'days_in_waiting_list': 'int16',
+    }
+    for col, dtype in downcast.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    
+    df['hotel_type'] = df['hotel_type'].astype('category')
+    if 'market_segment' in df.columns:
+        df['market_segment'] = df['market_segment'].astype('category')
+    if 'arrival_month' in df.columns:
+        df['arrival_month'] = df['arrival_month'].astype(pd.CategoricalDtype(month_order, ordered=True))
+    
+    return df
+
 @st.cache_data
 def load_data():
     try:
-        df = pd.read_csv('data/hotel_bookings.csv')
+        df = clean_bookings(read_bookings())
+        
+        if 'stays_in_weekend_nights' in df.columns and 'stays_in_week_nights' in df.columns:
+            df['total_nights'] = np.add(df['stays_in_weekend_nights'].to_numpy(np.int8), df['stays_in_week_nights'].to_numpy(np.int8))
         
-        df = df.rename(columns={
-            'hotel': 'hotel_type',
-            'arrival_date_month': 'arrival_month',
-        })
+        if 'adults' in df.columns:
+            adults = df['adults'].to_numpy(np.int8)
+            children = np.nan_to_num(df['children'].to_numpy(np.float32)).astype(np.int8)
+            babies = np.nan_to_num(df['babies'].to_numpy(np.float32)).astype(np.int8)
+            df['total_guests'] = adults + children + babies
         
-        if 'is_canceled' in df.columns and 'lead_time' in df.columns and 'adr' in df.columns:
-            df = df.dropna(subset=['is_canceled', 'lead_time', 'adr'])
+        df['booking_window'] = pd.cut(df['lead_time'], bins=[-np.inf, 30, 90, 180, np.inf],
+                                      labels=['Last minute', '1-3 months', '3-6 months', 'Way ahead'])
         
         st.success(f"✅ Loaded {len(df):,} real records from your CSV")
         return df
@@ -29,67 +85,112 @@ def load_data():
         st.error(f"Error loading CSV: {str(e)}")
         return None
 
-df = load_data()
+@st.cache_data
+def get_uniques(_df):
+    hotel_types = tuple(_df['hotel_type'].unique())
+    market_segments = tuple(_df['market_segment'].unique()) if 'market_segment' in _df.columns else ()
+    return hotel_types, market_segments
 
-if df is None:
-    st.stop()
+def category_mask(col, selected):
+    codes = col.cat.categories.get_indexer(list(selected))
+    return np.isin(col.cat.codes.to_numpy(), codes)
+
+@st.cache_data
+def agg_by(_df, key_col, filters_key):
+    col = _df[key_col]
+    codes = col.cat.codes.to_numpy()
+    valid = codes >= 0
+    k = len(col.cat.categories)
+    sums = np.bincount(codes[valid], weights=_df['is_canceled'].to_numpy()[valid], minlength=k)
+    counts = np.bincount(codes[valid], minlength=k)
+    stats = pd.DataFrame({'sum': sums, 'count': counts}, index=col.cat.categories)
+    return stats[stats['count'] > 0]
 
-if 'stays_in_weekend_nights' in df.columns and 'stays_in_week_nights' in df.columns:
-    df['total_nights'] = df['stays_in_weekend_nights'] + df['stays_in_week_nights']
+@st.cache_data
+def corr_by(_df, columns, filters_key):
+    cm = np.corrcoef(_df[list(columns)].to_numpy(dtype=np.float32), rowvar=False)
+    return pd.DataFrame(cm, index=columns, columns=columns)
 
-if 'adults' in df.columns:
-    df['total_guests'] = df['adults'] + df['children'].fillna(0) + df['babies'].fillna(0)
+@st.cache_data
+def describe_by(_df, columns, filters_key):
+    return _df[list(columns)].describe(percentiles=[.25, .5, .75]).T
 
-def booking_window(days):
-    if days <= 30:
-        return 'Last minute'
-    elif days <= 90:
-        return '1-3 months'
-    elif days <= 180:
-        return '3-6 months'
-    else:
-        return 'Way ahead'
+@st.cache_data
+def column_histogram(_arrays, filters_key, column, bins, bin_range=None, above=None, below=None):
+    values = _arrays[column]
+    if above is not None:
+        values = values[values > above]
+    if below is not None:
+        values = values[values < below]
+    return np.histogram(values, bins=bins, range=bin_range)
+
+def histogram_figure(counts, edges, column, title):
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(title=title, xaxis_title=column, yaxis_title='count', bargap=0)
+    return fig
 
-df['booking_window'] = df['lead_time'].apply(booking_window)
-df['has_special_requests'] = df['total_of_special_requests'] > 0
+df = load_data()
+
+if df is None:
+    st.stop()
+
+hotel_types, market_segments = get_uniques(df)
 
 with st.sidebar:
     st.title("🔧 Dashboard Controls")
     st.markdown("---")
     
-    hotel_filter = st.multiselect("Select Hotel Type", df['hotel_type'].unique(), default=df['hotel_type'].unique())
+    hotel_filter = st.multiselect("Select Hotel Type", hotel_types, default=hotel_types)
     
     if 'market_segment' in df.columns:
-        market_filter = st.multiselect("Select Market Segment", df['market_segment'].unique(), default=df['market_segment'].unique())
-        filtered_df = df[(df['hotel_type'].isin(hotel_filter)) & (df['market_segment'].isin(market_filter))]
+        market_filter = st.multiselect("Select Market Segment", market_segments, default=market_segments)
+    else:
+        market_filter = []
+    
+    if set(hotel_filter) >= set(hotel_types) and set(market_filter) >= set(market_segments):
+        filtered_df = df
+    elif 'market_segment' in df.columns:
+        filtered_df = df[category_mask(df['hotel_type'], hotel_filter) & category_mask(df['market_segment'], market_filter)]
     else:
-        filtered_df = df[df['hotel_type'].isin(hotel_filter)]
+        filtered_df = df[category_mask(df['hotel_type'], hotel_filter)]
+    
+    used_cols = ['is_canceled', 'lead_time', 'adr', 'booking_changes', 'days_in_waiting_list', 'total_of_special_requests']
+    arrays = {c: filtered_df[c].to_numpy() for c in used_cols if c in filtered_df.columns}
+    n_bookings = len(filtered_df)
+    n_canceled = int(arrays['is_canceled'].sum())
+    cancel_pct = arrays['is_canceled'].mean() * 100
     
     st.markdown("---")
-    st.markdown(f"**Records displayed:** {len(filtered_df)}")
-    st.markdown(f"**Cancellation rate:** {(filtered_df['is_canceled'].mean() * 100):.1f}%")
+    st.markdown(f"**Records displayed:** {n_bookings}")
+    st.markdown(f"**Cancellation rate:** {cancel_pct:.1f}%")
+
+filters_key = (tuple(hotel_filter), tuple(market_filter))
+
+def cancel_rate(col):
+    stats = agg_by(filtered_df, col, filters_key)
+    return stats['sum'] / stats['count'] * 100
 
 st.markdown("---")
 col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
-    st.metric("Total Bookings", f"{len(filtered_df):,}")
+    st.metric("Total Bookings", f"{n_bookings:,}")
 with col2:
-    st.metric("Cancellations", f"{int(filtered_df['is_canceled'].sum()):,}")
+    st.metric("Cancellations", f"{n_canceled:,}")
 with col3:
-    st.metric("Completed", f"{int(len(filtered_df) - filtered_df['is_canceled'].sum()):,}")
+    st.metric("Completed", f"{n_bookings - n_canceled:,}")
 with col4:
-    st.metric("Avg Lead Time (days)", f"{filtered_df['lead_time'].mean():.0f}")
+    st.metric("Avg Lead Time (days)", f"{arrays['lead_time'].mean():.0f}")
 with col5:
-    st.metric("Avg Room Price ($)", f"${filtered_df['adr'].mean():.2f}")
+    st.metric("Avg Room Price ($)", f"${arrays['adr'].mean():.2f}")
 
 st.markdown("---")
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Univariate", "🔄 Bivariate", "🎯 Multivariate", "💡 Insights", "📋 Summary"])
 
-with tab1:
+def render_univariate():
     st.subheader("Univariate Analysis - Individual Variable Distributions")
     
     st.markdown("#### 📊 Lead Time Distribution")
-    fig1 = px.histogram(filtered_df, x='lead_time', nbins=50, title='Lead Time Distribution (Days)')
+    fig1 = histogram_figure(*column_histogram(arrays, filters_key, 'lead_time', 50),
+                            'lead_time', 'Lead Time Distribution (Days)')
     st.plotly_chart(fig1, use_container_width=True)
     st.markdown("""
     **📌 Insight:** Lead time shows a right-skewed distribution, with most bookings made within the first few months. 
@@ -100,7 +201,8 @@ with tab1:
     st.markdown("---")
     
     st.markdown("#### 💰 Room Price (ADR) Distribution")
-    fig2 = px.histogram(filtered_df[filtered_df['adr'] < 500], x='adr', nbins=40, title='Average Daily Rate Distribution (ADR in $)')
+    fig2 = histogram_figure(*column_histogram(arrays, filters_key, 'adr', 40, below=500),
+                            'adr', 'Average Daily Rate Distribution (ADR in $)')
     st.plotly_chart(fig2, use_container_width=True)
     st.markdown("""
     **📌 Insight:** Room prices show a concentration in the lower price ranges ($0-$150), with a long tail extending to higher prices.
@@ -110,9 +212,12 @@ with tab1:
     
     st.markdown("---")
     
-    if 'booking_changes' in filtered_df.columns:
+    if 'booking_changes' in arrays:
         st.markdown("#### 🔄 Booking Changes Distribution")
-        fig3 = px.histogram(filtered_df, x='booking_changes', nbins=20, title='Number of Booking Changes')
+        n_changes = int(arrays['booking_changes'].max()) + 1 if arrays['booking_changes'].size else 1
+        fig3 = histogram_figure(*column_histogram(arrays, filters_key, 'booking_changes', n_changes,
+                                                  (-0.5, n_changes - 0.5)),
+                                'booking_changes', 'Number of Booking Changes')
         st.plotly_chart(fig3, use_container_width=True)
         st.markdown("""
         **📌 Insight:** Most bookings undergo few or no changes after reservation.
@@ -120,30 +225,29 @@ with tab1:
         """)
         st.markdown("---")
     
-    if 'days_in_waiting_list' in filtered_df.columns:
+    if 'days_in_waiting_list' in arrays:
         st.markdown("#### ⏳ Days in Waiting List Distribution")
-        waiting_data = filtered_df[filtered_df['days_in_waiting_list'] > 0]
-        if len(waiting_data) > 0:
-            fig4 = px.histogram(waiting_data, x='days_in_waiting_list', nbins=30, title='Days in Waiting List')
+        counts, edges = column_histogram(arrays, filters_key, 'days_in_waiting_list', 30, above=0)
+        if counts.sum() > 0:
+            fig4 = histogram_figure(counts, edges, 'days_in_waiting_list', 'Days in Waiting List')
             st.plotly_chart(fig4, use_container_width=True)
             st.markdown("""
             **📌 Insight:** Only a subset of bookings go on waiting list. Those that do show variable wait times,
             suggesting fluctuating inventory and demand patterns.
             """)
 
-with tab2:
+def render_bivariate():
     st.subheader("Bivariate Analysis - Relationships Between Variables")
     
     st.markdown("#### 🏨 Hotel Type vs Cancellation Rate")
-    hotel_cancel_data = filtered_df.groupby('hotel_type')['is_canceled'].agg(['sum', 'count', 'mean'])
-    hotel_cancel_data['percent'] = (hotel_cancel_data['mean'] * 100).round(2)
+    hotel_cancel_data = agg_by(filtered_df, 'hotel_type', filters_key).assign(percent=cancel_rate('hotel_type').round(2))
     
-    fig5 = px.bar(x=hotel_cancel_data.index, y=hotel_cancel_data['percent'], 
+    fig5 = px.bar(x=hotel_cancel_data.index.to_numpy(), y=hotel_cancel_data['percent'].to_numpy(np.float32), 
                   title='Cancellation Rate by Hotel Type',
                   labels={'y': 'Cancellation Rate (%)'})
     st.plotly_chart(fig5, use_container_width=True)
     
-    insight_text = "City hotels: " + str(hotel_cancel_data['percent'].iloc[0]) + "% cancellation rate, Resort hotels: " + str(hotel_cancel_data['percent'].iloc[-1]) + "% cancellation rate"
+    insight_text = ", ".join(f"{hotel}s: {pct:.1f}% cancellation rate" for hotel, pct in hotel_cancel_data['percent'].items())
     st.markdown(f"""
     **📌 Insight:** {insight_text}
     
@@ -157,8 +261,8 @@ with tab2:
     
     st.markdown("#### 📅 Booking Window vs Cancellation Rate")
     window_order = ['Last minute', '1-3 months', '3-6 months', 'Way ahead']
-    window_cancel = filtered_df.groupby('booking_window')['is_canceled'].mean() * 100
-    window_data = [window_cancel.get(w, 0) for w in window_order]
+    window_cancel = cancel_rate('booking_window')
+    window_data = window_cancel.reindex(window_order, fill_value=0).to_numpy(np.float32)
     
     fig6 = px.bar(x=window_order, y=window_data, 
                   title='Cancellation Rate by Booking Window',
@@ -178,16 +282,16 @@ with tab2:
     st.markdown("---")
     
     st.markdown("#### ⭐ Special Requests vs Cancellation Rate")
-    requests_cancel = filtered_df.groupby('has_special_requests')['is_canceled'].mean() * 100
+    has_requests = arrays['total_of_special_requests'] > 0
+    yes_req_rate = arrays['is_canceled'][has_requests].mean() * 100
+    no_req_rate = arrays['is_canceled'][~has_requests].mean() * 100
     
     fig7 = px.bar(x=['No Special Requests', 'Has Special Requests'], 
-                  y=[requests_cancel[False], requests_cancel[True]],
+                  y=np.array([no_req_rate, yes_req_rate], dtype=np.float32),
                   title='Cancellation Rate by Special Requests',
                   labels={'y': 'Cancellation Rate (%)'})
     st.plotly_chart(fig7, use_container_width=True)
     
-    no_req_rate = requests_cancel[False]
-    yes_req_rate = requests_cancel[True]
     multiplier = no_req_rate / yes_req_rate if yes_req_rate > 0 else 0
     
     st.markdown(f"""
@@ -203,10 +307,10 @@ with tab2:
     if 'market_segment' in filtered_df.columns:
         st.markdown("---")
         st.markdown("#### 🎯 Market Segment vs Cancellation Rate")
-        market_cancel = filtered_df.groupby('market_segment')['is_canceled'].mean() * 100
+        market_cancel = cancel_rate('market_segment')
         market_cancel = market_cancel.sort_values(ascending=False)
         
-        fig8 = px.bar(x=market_cancel.values, y=market_cancel.index, 
+        fig8 = px.bar(x=market_cancel.to_numpy(np.float32), y=market_cancel.index.to_numpy(), 
                       orientation='h',
                       title='Cancellation Rate by Market Segment',
                       labels={'x': 'Cancellation Rate (%)'})
@@ -218,22 +322,21 @@ with tab2:
         Corporate segment shows lower cancellation, indicating committed bookings.
         """)
 
-with tab3:
+def render_multivariate():
     st.subheader("Multivariate Analysis - Complex Patterns")
     
     st.markdown("#### 🌡️ Seasonal Patterns in Cancellations")
     if 'arrival_month' in filtered_df.columns:
-        month_order = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
-        month_cancel = filtered_df.groupby('arrival_month')['is_canceled'].mean() * 100
-        month_data = [month_cancel.get(m, 0) for m in month_order]
+        month_cancel = cancel_rate('arrival_month')
+        month_data = month_cancel.reindex(month_order, fill_value=0).to_numpy(np.float32)
         
         fig9 = px.line(x=month_order, y=month_data, markers=True,
                       title='Cancellation Rate Throughout the Year',
                       labels={'y': 'Cancellation Rate (%)', 'x': 'Month'})
         st.plotly_chart(fig9, use_container_width=True)
         
-        summer_peak = max(month_data[4:8])
-        winter_low = min(month_data[11:] + month_data[:2])
+        summer_peak = month_data[4:8].max()
+        winter_low = np.concatenate([month_data[11:], month_data[:2]]).min()
         
         st.markdown(f"""
         **📌 Insight:** Clear seasonal variation in cancellation rates:
@@ -254,10 +357,10 @@ with tab3:
                     if col in filtered_df.columns and filtered_df[col].notna().sum() > 0]
     
     if len(numeric_cols) > 1:
-        corr_matrix = filtered_df[numeric_cols].corr()
+        corr_matrix = corr_by(filtered_df, tuple(numeric_cols), filters_key)
         
         fig10 = go.Figure(data=go.Heatmap(
-            z=corr_matrix.values,
+            z=corr_matrix.to_numpy(),
             x=corr_matrix.columns,
             y=corr_matrix.columns,
             colorscale='RdBu',
@@ -283,7 +386,7 @@ with tab3:
           → Higher priced rooms have {price_direction} cancellation
         """)
 
-with tab4:
+def render_insights():
     st.subheader("💡 Key Insights & Business Recommendations")
     
     col1, col2 = st.columns(2)
@@ -291,13 +394,14 @@ with tab4:
     with col1:
         st.markdown("### 🔍 Critical Findings")
         
-        avg_cancel_rate = filtered_df['is_canceled'].mean() * 100
-        high_risk = filtered_df[filtered_df['booking_window'] == 'Way ahead']['is_canceled'].mean() * 100
-        low_risk = filtered_df[filtered_df['booking_window'] == 'Last minute']['is_canceled'].mean() * 100
+        avg_cancel_rate = cancel_pct
+        window_cancel = cancel_rate('booking_window')
+        high_risk = window_cancel.get('Way ahead', np.nan)
+        low_risk = window_cancel.get('Last minute', np.nan)
         
         st.markdown(f"""
         **1. Overall Cancellation Rate: {avg_cancel_rate:.1f}%**
-           - {int(filtered_df['is_canceled'].sum()):,} cancellations out of {len(filtered_df):,} bookings
+           - {n_canceled:,} cancellations out of {n_bookings:,} bookings
         
         **2. Lead Time is Critical**
            - High-risk (180+ days): {high_risk:.1f}% cancellation
@@ -343,39 +447,41 @@ with tab4:
         📈 Improved operational efficiency
         """)
 
-with tab5:
+def render_summary():
     st.subheader("📋 Data Summary & Statistics")
     
     st.markdown(f"""
     **Dataset Overview:**
-    - Total Records: {len(filtered_df):,}
-    - Cancellations: {int(filtered_df['is_canceled'].sum()):,}
-    - Completed Stays: {len(filtered_df) - int(filtered_df['is_canceled'].sum()):,}
-    - Overall Cancellation Rate: {filtered_df['is_canceled'].mean() * 100:.2f}%
+    - Total Records: {n_bookings:,}
+    - Cancellations: {n_canceled:,}
+    - Completed Stays: {n_bookings - n_canceled:,}
+    - Overall Cancellation Rate: {cancel_pct:.2f}%
     """)
     
     st.markdown("---")
     
-    stats_dict = {}
-    for col in ['lead_time', 'adr', 'total_nights', 'total_guests', 'total_of_special_requests']:
-        if col in filtered_df.columns:
-            stats_dict[col] = {
-                'Min': filtered_df[col].min(),
-                'Q1': filtered_df[col].quantile(0.25),
-                'Median': filtered_df[col].median(),
-                'Mean': filtered_df[col].mean(),
-                'Q3': filtered_df[col].quantile(0.75),
-                'Max': filtered_df[col].max(),
-            }
-    
-    if stats_dict:
+    stat_cols = tuple(col for col in ['lead_time', 'adr', 'total_nights', 'total_guests', 'total_of_special_requests']
+                      if col in filtered_df.columns)
+    
+    if stat_cols:
+        stats_df = describe_by(filtered_df, stat_cols, filters_key)
         st.markdown("**Numerical Variables Statistics:**")
-        for col, stats in stats_dict.items():
+        for col, stats in stats_df.iterrows():
             col_display = col.replace('_', ' ').title()
             st.markdown(f"""
             **{col_display}:**
-            - Min: {stats['Min']:.2f} | Q1: {stats['Q1']:.2f} | Median: {stats['Median']:.2f} | Mean: {stats['Mean']:.2f} | Q3: {stats['Q3']:.2f} | Max: {stats['Max']:.2f}
+            - Min: {stats['min']:.2f} | Q1: {stats['25%']:.2f} | Median: {stats['50%']:.2f} | Mean: {stats['mean']:.2f} | Q3: {stats['75%']:.2f} | Max: {stats['max']:.2f}
             """)
 
+views = {
+    "📈 Univariate": render_univariate,
+    "🔄 Bivariate": render_bivariate,
+    "🎯 Multivariate": render_multivariate,
+    "💡 Insights": render_insights,
+    "📋 Summary": render_summary,
+}
+view = st.radio("View", list(views), horizontal=True, label_visibility="collapsed")
+views[view]()
+
 st.markdown("---")
 st.markdown("<div style='text-align: center; color: #666; font-size: 12px;'><p>Hotel Booking Cancellation Analysis Dashboard | Component 3</p></div>", unsafe_allow_html=True)
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os
+from itertools import product
 import plotly.graph_objects as go
 import plotly.express as px
 import warnings
@@ -10,12 +12,36 @@ warnings.filterwarnings('ignore')
 st.set_page_config(page_title="Hotel Booking Dashboard", page_icon="🏨", layout="wide")
 st.title("🏨 Hotel Booking Cancellation Dashboard")
 
-# --- Data Loading ---
-@st.cache_data
-def load_data():
+month_order = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+
+# --- Data Loading & Feature Engineering ---
+def read_bookings(csv_path='data/hotel_bookings.csv', parquet_path='data/hotel_bookings_raw.parquet'):
+    # Prefer the Parquet copy when it's at least as new as the CSV
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        return pd.read_parquet(parquet_path)
+    
+    # Low-cardinality text columns are read straight into Categoricals
+    dtypes = {'hotel': 'category', 'market_segment': 'category', 'arrival_date_month': 'category'}
+    try:
+        # pyarrow parses the file on multiple threads
+        df = pd.read_csv(csv_path, engine='pyarrow', dtype=dtypes)
+    except ImportError:
+        df = pd.read_csv(csv_path, dtype=dtypes)
+    
+    # Save a Parquet copy so the next cold start skips CSV parsing
+    try:
+        df.to_parquet(parquet_path)
+    except (ImportError, OSError):
+        pass
+    
+    return df
+
+# cache_resource hands every session the same (read-only) DataFrame instead of a per-session copy
+@st.cache_resource
+def load_and_prepare():
     try:
         # Load the dataset
-        df = pd.read_csv('data/hotel_bookings.csv')
+        df = read_bookings()
         
         # Rename columns for clarity
         df = df.rename(columns={
@@ -23,10 +49,52 @@ def load_data():
             'arrival_date_month': 'arrival_month',
         })
         
+        # Calendar-ordered months, so per-month aggregates come out January..December without a reindex
+        if 'arrival_month' in df.columns:
+            df['arrival_month'] = df['arrival_month'].astype(pd.CategoricalDtype(month_order, ordered=True))
+        
         # Basic cleaning: drop rows where key columns are missing
         if 'is_canceled' in df.columns and 'lead_time' in df.columns and 'adr' in df.columns:
             df = df.dropna(subset=['is_canceled', 'lead_time', 'adr'])
         
+        # Downcast small non-negative counts so every scan and groupby moves fewer bytes
+        for col in ['is_canceled', 'total_of_special_requests', 'booking_changes', 'stays_in_weekend_nights',
+                    'stays_in_week_nights', 'adults', 'children', 'babies', 'days_in_waiting_list']:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], downcast='unsigned')
+        df['lead_time'] = df['lead_time'].astype('int16')
+        df['adr'] = df['adr'].astype('float32')
+        
+        # Create 'total_nights'
+        if 'stays_in_weekend_nights' in df.columns and 'stays_in_week_nights' in df.columns:
+            df['total_nights'] = df['stays_in_weekend_nights'] + df['stays_in_week_nights']
+        
+        # Create 'total_guests'
+        if 'adults' in df.columns:
+            # Sum the raw arrays (missing counts as 0) instead of chaining fillna on Series
+            guest_counts = [np.nan_to_num(df[col].to_numpy(dtype='float32')) for col in ['adults', 'children', 'babies']]
+            total_guests = np.add.reduce(guest_counts)
+            # Filter out bookings with 0 guests in a single copy
+            has_guests = total_guests > 0
+            df = df.loc[has_guests].copy()
+            df['total_guests'] = total_guests[has_guests].astype('int8')
+        
+        # Create 'booking_window' categories (upper bounds are inclusive, so 30 days is still 'Last minute')
+        window_bins = np.array([30, 90, 180])
+        window_labels = ['Last minute (0-30 days)', '1-3 months (31-90 days)', '3-6 months (91-180 days)', 'Way ahead (181+ days)']
+        window_idx = np.searchsorted(window_bins, df['lead_time'].to_numpy(), side='left')
+        # The searchsorted positions are the category codes, so no per-row label strings are built
+        df['booking_window'] = pd.Categorical.from_codes(window_idx, categories=window_labels, ordered=True)
+        
+        # Create 'has_special_requests'
+        if 'total_of_special_requests' in df.columns:
+            df['has_special_requests'] = df['total_of_special_requests'] > 0
+        
+        # Drop categories left empty by the cleaning above so .cat.categories lists only values present in the data
+        for col in ['hotel_type', 'market_segment']:
+            if col in df.columns:
+                df[col] = df[col].cat.remove_unused_categories()
+        
         st.success(f"✅ Loaded {len(df):,} real records from your CSV")
         return df
         
@@ -38,39 +106,85 @@ def load_data():
         st.error(f"Error loading CSV: {str(e)}")
         return None
 
-df = load_data()
+# --- Cached Aggregations ---
+@st.cache_resource
+def build_partitions(_df):
+    # Pre-split the data by (hotel, segment) so filtering only has to stitch the selected pieces together
+    return {key: part for key, part in _df.groupby(['hotel_type', 'market_segment'], observed=True)}
 
-# Stop the app if data loading failed
-if df is None:
-    st.stop()
+def group_cancel_rate(keys, canceled, observed=True):
+    # Fused per-group sum/count over integer codes: one bincount pass instead of pandas' generic groupby
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        codes, labels = keys.cat.codes.to_numpy(), keys.cat.categories
+    else:
+        codes, labels = pd.factorize(keys, sort=True)
+    valid = codes >= 0
+    sums = np.bincount(codes[valid], weights=canceled[valid], minlength=len(labels))
+    counts = np.bincount(codes[valid], minlength=len(labels))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = sums / counts * 100
+    # observed=True keeps only groups that actually occur; observed=False keeps empty ones as NaN
+    keep = counts > 0 if observed else np.ones(len(labels), dtype=bool)
+    return pd.Series(np.where(counts > 0, rates, np.nan)[keep],
+                     index=pd.Index(labels[keep], name=keys.name), name='is_canceled')
 
-# --- Feature Engineering ---
-# Create 'total_nights'
-if 'stays_in_weekend_nights' in df.columns and 'stays_in_week_nights' in df.columns:
-    df['total_nights'] = df['stays_in_weekend_nights'] + df['stays_in_week_nights']
+@st.cache_data
+def compute_aggs(_filtered_df, hotel_key, market_key):
+    # The filter selections form the cache key, so the (unhashed) frame is only aggregated once per selection
+    canceled = _filtered_df['is_canceled'].to_numpy()
+    rates = {}
+    for col in ['hotel_type', 'booking_window', 'has_special_requests', 'market_segment', 'arrival_month']:
+        if col in _filtered_df.columns:
+            # Keep all 12 months so an empty month shows as a gap on the seasonal line
+            rates[col] = group_cancel_rate(_filtered_df[col], canceled, observed=(col != 'arrival_month'))
+    return rates
 
-# Create 'total_guests'
-if 'adults' in df.columns:
-    df['total_guests'] = df['adults'].fillna(0) + df['children'].fillna(0) + df['babies'].fillna(0)
-    # Filter out bookings with 0 guests
-    df = df[df['total_guests'] > 0]
+@st.cache_data
+def compute_kpis(_filtered_df, hotel_key, market_key):
+    # Headline numbers for the KPI row, sidebar and summary tab, computed once per filter selection
+    n_bookings = len(_filtered_df)
+    canceled = int(_filtered_df['is_canceled'].sum())
+    return {
+        'bookings': n_bookings,
+        'canceled': canceled,
+        'completed': n_bookings - canceled,
+        'cancel_rate': canceled / n_bookings * 100 if n_bookings else 0.0,
+        'lead_time': _filtered_df['lead_time'].mean(),
+        # Filter out $0 ADR for a more meaningful average
+        'adr': _filtered_df.loc[_filtered_df['adr'] > 0, 'adr'].mean(),
+    }
 
-# Create 'booking_window' categories
-def booking_window(days):
-    if days <= 30:
-        return 'Last minute (0-30 days)'
-    elif days <= 90:
-        return '1-3 months (31-90 days)'
-    elif days <= 180:
-        return '3-6 months (91-180 days)'
-    else:
-        return 'Way ahead (181+ days)'
+@st.cache_data
+def get_sample(_filtered_df, hotel_key, market_key, n=5000):
+    # Random positional sample with only the columns the scatter plot needs
+    k = min(n, len(_filtered_df))
+    rows = np.random.default_rng(42).choice(len(_filtered_df), k, replace=False)
+    cols = [col for col in ['lead_time', 'adr', 'is_canceled', 'total_nights', 'market_segment', 'hotel_type']
+            if col in _filtered_df.columns]
+    return _filtered_df.iloc[rows][cols]
+
+@st.cache_data
+def compute_histogram(_filtered_df, hotel_key, market_key, column, bins, bin_range=None, above=None, below=None):
+    # Bin server-side so only the bin counts (not every row) are sent to the browser
+    values = _filtered_df[column].to_numpy()
+    # Apply the bounds here so a cache hit skips the masking too
+    if above is not None:
+        values = values[values > above]
+    if below is not None:
+        values = values[values < below]
+    return np.histogram(values, bins=bins, range=bin_range)
 
-df['booking_window'] = df['lead_time'].apply(booking_window)
+def histogram_figure(counts, edges, title, x_label, color):
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=(edges[1] - edges[0]) * 0.9, marker_color=color))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title='count')
+    return fig
 
-# Create 'has_special_requests'
-if 'total_of_special_requests' in df.columns:
-    df['has_special_requests'] = df['total_of_special_requests'] > 0
+df = load_and_prepare()
+
+# Stop the app if data loading failed
+if df is None:
+    st.stop()
 
 # --- Sidebar Filters ---
 with st.sidebar:
@@ -78,62 +192,66 @@ with st.sidebar:
     st.markdown("---")
     
     # Hotel Type Filter
-    hotel_types = df['hotel_type'].unique()
+    hotel_types = df['hotel_type'].cat.categories.to_list()
     hotel_filter = st.multiselect("Select Hotel Type", hotel_types, default=hotel_types)
     
     # Market Segment Filter
     if 'market_segment' in df.columns:
-        market_segments = df['market_segment'].unique()
+        market_segments = df['market_segment'].cat.categories.to_list()
         market_filter = st.multiselect("Select Market Segment", market_segments, default=market_segments)
         
-        # Apply filters
-        filtered_df = df[
-            (df['hotel_type'].isin(hotel_filter)) & 
-            (df['market_segment'].isin(market_filter))
-        ]
+        # Apply filters (everything selected is the default, so skip the work entirely)
+        if set(hotel_filter) >= set(hotel_types) and set(market_filter) >= set(market_segments):
+            filtered_df = df
+        else:
+            partitions = build_partitions(df)
+            selected = [partitions[key] for key in product(hotel_filter, market_filter) if key in partitions]
+            filtered_df = pd.concat(selected) if selected else df.iloc[:0]
     else:
+        market_filter = []
         filtered_df = df[df['hotel_type'].isin(hotel_filter)]
     
+    # The filter selections identify the current view for all cached computations
+    hotel_key, market_key = tuple(hotel_filter), tuple(market_filter)
+    kpis = compute_kpis(filtered_df, hotel_key, market_key)
+    
     # Display summary metrics in the sidebar
     st.markdown("---")
-    st.markdown(f"**Records displayed:** {len(filtered_df):,}")
+    st.markdown(f"**Records displayed:** {kpis['bookings']:,}")
     if not filtered_df.empty:
-        st.markdown(f"**Cancellation rate:** {(filtered_df['is_canceled'].mean() * 100):.1f}%")
+        st.markdown(f"**Cancellation rate:** {kpis['cancel_rate']:.1f}%")
 
 # Stop if filters result in no data
 if filtered_df.empty:
     st.warning("No data matches the current filters. Please adjust your selection.")
     st.stop()
 
+# Cancellation rates (%) per category, shared by all tabs
+cancel_rates = compute_aggs(filtered_df, hotel_key, market_key)
+
 # --- Main Page KPIs ---
 st.markdown("---")
 col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
-    st.metric("Total Bookings", f"{len(filtered_df):,}")
+    st.metric("Total Bookings", f"{kpis['bookings']:,}")
 with col2:
-    st.metric("Cancellations", f"{int(filtered_df['is_canceled'].sum()):,}")
+    st.metric("Cancellations", f"{kpis['canceled']:,}")
 with col3:
-    completed_bookings = len(filtered_df) - filtered_df['is_canceled'].sum()
-    st.metric("Completed Stays", f"{int(completed_bookings):,}")
+    st.metric("Completed Stays", f"{kpis['completed']:,}")
 with col4:
-    st.metric("Avg Lead Time (days)", f"{filtered_df['lead_time'].mean():.0f}")
+    st.metric("Avg Lead Time (days)", f"{kpis['lead_time']:.0f}")
 with col5:
-    # Filter out $0 ADR for a more meaningful average
-    st.metric("Avg Room Price ($)", f"${filtered_df[filtered_df['adr'] > 0]['adr'].mean():.2f}")
+    st.metric("Avg Room Price ($)", f"${kpis['adr']:.2f}")
 
 st.markdown("---")
 
-# --- Tabs for Analysis ---
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Univariate", "🔄 Bivariate", "🎯 Multivariate", "💡 Recommendations", "📋 Summary"])
-
-with tab1:
+# --- Analysis Views ---
+def render_univariate():
     st.subheader("Univariate Analysis - Individual Variable Distributions")
     
     st.markdown("#### 📊 Lead Time Distribution")
-    fig1 = px.histogram(filtered_df, x='lead_time', nbins=50, 
-                        title='Lead Time Distribution (Days)',
-                        color_discrete_sequence=['#1f77b4']) # Vibrant blue
-    fig1.update_layout(bargap=0.1)
+    counts, edges = compute_histogram(filtered_df, hotel_key, market_key, 'lead_time', 50)
+    fig1 = histogram_figure(counts, edges, 'Lead Time Distribution (Days)', 'lead_time', '#1f77b4') # Vibrant blue
     st.plotly_chart(fig1, use_container_width=True)
     st.markdown("""
     **📌 Insight:** The lead time is heavily right-skewed. This means most bookings are made "Last minute" (within 30 days),
@@ -145,11 +263,8 @@ with tab1:
     
     st.markdown("#### 💰 Room Price (ADR) Distribution")
     # Filter out extreme outliers for a clearer plot
-    adr_data = filtered_df[(filtered_df['adr'] > 0) & (filtered_df['adr'] < 500)]
-    fig2 = px.histogram(adr_data, x='adr', nbins=40, 
-                        title='Average Daily Rate Distribution (ADR in $)',
-                        color_discrete_sequence=['#2ca02c']) # Green
-    fig2.update_layout(bargap=0.1)
+    counts, edges = compute_histogram(filtered_df, hotel_key, market_key, 'adr', 40, above=0, below=500)
+    fig2 = histogram_figure(counts, edges, 'Average Daily Rate Distribution (ADR in $)', 'adr', '#2ca02c') # Green
     st.plotly_chart(fig2, use_container_width=True)
     st.markdown("""
     **📌 Insight:** Most bookings are concentrated in the $50-$150 price range, which is likely the hotel's
@@ -161,9 +276,11 @@ with tab1:
     
     if 'booking_changes' in filtered_df.columns:
         st.markdown("#### 🔄 Booking Changes Distribution")
-        fig3 = px.histogram(filtered_df, x='booking_changes', 
-                            title='Number of Booking Changes',
-                            color_discrete_sequence=['#ff7f0e']) # Orange
+        # One bin per whole number of changes
+        n_changes = int(filtered_df['booking_changes'].max()) + 1
+        counts, edges = compute_histogram(filtered_df, hotel_key, market_key,
+                                          'booking_changes', n_changes, (-0.5, n_changes - 0.5))
+        fig3 = histogram_figure(counts, edges, 'Number of Booking Changes', 'booking_changes', '#ff7f0e') # Orange
         st.plotly_chart(fig3, use_container_width=True)
         st.markdown("""
         **📌 Insight:** The vast majority of bookings (the first bar) have **zero** changes.
@@ -174,11 +291,10 @@ with tab1:
     
     if 'days_in_waiting_list' in filtered_df.columns:
         st.markdown("#### ⏳ Days in Waiting List Distribution")
-        waiting_data = filtered_df[filtered_df['days_in_waiting_list'] > 0]
-        if not waiting_data.empty:
-            fig4 = px.histogram(waiting_data, x='days_in_waiting_list', nbins=30, 
-                                title='Days in Waiting List (For those who waited)',
-                                color_discrete_sequence=['#d62728']) # Red
+        counts, edges = compute_histogram(filtered_df, hotel_key, market_key, 'days_in_waiting_list', 30, above=0)
+        if counts.sum() > 0:
+            fig4 = histogram_figure(counts, edges, 'Days in Waiting List (For those who waited)',
+                                    'days_in_waiting_list', '#d62728') # Red
             st.plotly_chart(fig4, use_container_width=True)
             st.markdown("""
             **📌 Insight:** Very few bookings ever end up on a waiting list. For the small fraction
@@ -189,21 +305,20 @@ with tab1:
         else:
             st.info("No bookings in the filtered data spent time on the waiting list.")
 
-with tab2:
+def render_bivariate():
     st.subheader("Bivariate Analysis - Relationships Between Variables")
     
     st.markdown("#### 🏨 Hotel Type vs Cancellation Rate")
-    hotel_cancel_data = filtered_df.groupby('hotel_type')['is_canceled'].mean().reset_index()
-    hotel_cancel_data['percent'] = (hotel_cancel_data['is_canceled'] * 100)
+    hotel_cancel_data = cancel_rates['hotel_type'].rename('percent').reset_index()
     
     fig5 = px.bar(hotel_cancel_data, x='hotel_type', y='percent', 
                   title='Cancellation Rate by Hotel Type',
                   labels={'percent': 'Cancellation Rate (%)', 'hotel_type': 'Hotel Type'},
                   color='hotel_type',
                   color_discrete_map={'City Hotel': '#1f77b4', 'Resort Hotel': '#2ca02c'},
-                  text=hotel_cancel_data['percent'].apply(lambda x: f'{x:.1f}%'),
+                  text='percent',
                   hover_data={'hotel_type': True, 'percent': ':.1f'}) # 'hotel_type' set to True for visibility
-    fig5.update_traces(textposition='outside')
+    fig5.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
     st.plotly_chart(fig5, use_container_width=True)
     
     st.markdown(f"""
@@ -219,9 +334,8 @@ with tab2:
     
     st.markdown("#### 📅 Booking Window vs Cancellation Rate")
     
-    window_order = ['Last minute (0-30 days)', '1-3 months (31-90 days)', '3-6 months (91-180 days)', 'Way ahead (181+ days)']
     # Convert the Series to a DataFrame
-    window_cancel_df = (filtered_df.groupby('booking_window')['is_canceled'].mean() * 100).reset_index()
+    window_cancel_df = cancel_rates['booking_window'].reset_index()
     # Rename columns for clarity
     window_cancel_df.columns = ['Booking Window', 'Cancellation Rate (%)']
     
@@ -233,11 +347,11 @@ with tab2:
                   color='Booking Window',
                   color_discrete_sequence=px.colors.sequential.YlOrRd[2::2],
                   text='Cancellation Rate (%)',
-                  hover_data={'Booking Window': True, 'Cancellation Rate (%)': ':.1f'}) 
+                  hover_data={'Booking Window': True, 'Cancellation Rate (%)': ':.1f'},
+                  # Keep the windows in their logical order on the axis
+                  category_orders={'Booking Window': list(df['booking_window'].cat.categories)}) 
     
     fig6.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-    # Ensure the x-axis keeps the logical order
-    fig6.update_layout(xaxis={'categoryorder':'array', 'categoryarray': window_order})
     st.plotly_chart(fig6, use_container_width=True)
     
     st.markdown(f"""
@@ -253,7 +367,7 @@ with tab2:
     
     if 'has_special_requests' in filtered_df.columns:
         st.markdown("#### ⭐ Special Requests vs Cancellation Rate")
-        requests_cancel = (filtered_df.groupby('has_special_requests')['is_canceled'].mean() * 100).reset_index()
+        requests_cancel = cancel_rates['has_special_requests'].reset_index()
         requests_cancel['has_special_requests_str'] = requests_cancel['has_special_requests'].map({True: 'Has Special Requests', False: 'No Special Requests'})
         
         fig7 = px.bar(requests_cancel, x='has_special_requests_str', y='is_canceled', 
@@ -261,14 +375,16 @@ with tab2:
                       labels={'is_canceled': 'Cancellation Rate (%)', 'has_special_requests_str': 'Made Special Requests?'},
                       color='has_special_requests_str',
                       color_discrete_map={'No Special Requests': '#d62728', 'Has Special Requests': '#2ca02c'},
-                      text=requests_cancel['is_canceled'].apply(lambda x: f'{x:.1f}%'),
+                      text='is_canceled',
                       hover_data={'has_special_requests_str': True, 'is_canceled': ':.1f'})
-        fig7.update_traces(textposition='outside')
+        fig7.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
         fig7.update_xaxes(title_text="Made Special Requests?") # Cleaner axis title
         st.plotly_chart(fig7, use_container_width=True)
         
-        no_req_rate = requests_cancel[requests_cancel['has_special_requests'] == False]['is_canceled'].values[0]
-        yes_req_rate = requests_cancel[requests_cancel['has_special_requests'] == True]['is_canceled'].values[0]
+        # Look the two rates up by label instead of masking the frame for each one
+        request_rates = cancel_rates['has_special_requests']
+        no_req_rate = request_rates.loc[False]
+        yes_req_rate = request_rates.loc[True]
         
         st.markdown(f"""
         **📌 Insight:** This is a fascinating finding. Guests who **make special requests** are
@@ -284,7 +400,7 @@ with tab2:
         st.markdown("#### 🎯 Market Segment vs Cancellation Rate")
         
         # Convert the Series to a DataFrame
-        market_cancel_df = (filtered_df.groupby('market_segment')['is_canceled'].mean() * 100).reset_index()
+        market_cancel_df = cancel_rates['market_segment'].reset_index()
         # Rename columns for clarity
         market_cancel_df.columns = ['Market Segment', 'Cancellation Rate (%)']
         
@@ -310,13 +426,12 @@ with tab2:
         - **Direct** bookings and **Corporate** accounts appear to be much more reliable, with lower cancellation rates.
         """)
 
-with tab3:
+def render_multivariate():
     st.subheader("Multivariate Analysis - Complex Patterns")
     
     st.markdown("#### 🌡️ Seasonal Patterns in Cancellations")
     if 'arrival_month' in filtered_df.columns:
-        month_order = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
-        month_cancel = (filtered_df.groupby('arrival_month')['is_canceled'].mean() * 100).reindex(month_order)
+        month_cancel = cancel_rates['arrival_month']
         
         fig9 = px.line(month_cancel, x=month_cancel.index, y=month_cancel.values, 
                        title='Cancellation Rate Throughout the Year',
@@ -341,7 +456,7 @@ with tab3:
     st.markdown("#### 💸 Lead Time vs. Price (ADR) and Cancellation")
     
     # Sample the data to avoid overplotting and improve performance
-    sample_df = filtered_df.sample(n=min(5000, len(filtered_df)), random_state=42)
+    sample_df = get_sample(filtered_df, hotel_key, market_key)
     
     fig11 = px.scatter(sample_df, 
                        x='lead_time', 
@@ -350,12 +465,13 @@ with tab3:
                        title='Lead Time vs. ADR, Colored by Cancellation',
                        labels={'lead_time': 'Lead Time (Days)', 'adr': 'Average Daily Rate ($)', 'is_canceled': 'Canceled?'},
                        color_discrete_map={0: '#2ca02c', 1: '#d62728'},
-                       hover_data=['total_nights', 'market_segment', 'hotel_type'])
+                       hover_data=['total_nights', 'market_segment', 'hotel_type'],
+                       render_mode='webgl') # Draw markers with WebGL (Scattergl) instead of SVG
     
     fig11.update_traces(marker=dict(size=5, opacity=0.7))
     st.plotly_chart(fig11, use_container_width=True)
     st.markdown(f"""
-    *(This plot is based on a random sample of {min(5000, len(filtered_df)):,} bookings to keep the dashboard fast.)*
+    *(This plot is based on a random sample of {len(sample_df):,} bookings to keep the dashboard fast.)*
     
     **📌 Insight:** This scatter plot helps us see a few patterns at once:
     - **Cancellations (red dots)** appear to be more common at **longer lead times**, which confirms our earlier finding.
@@ -370,18 +486,19 @@ with tab3:
                     if col in filtered_df.columns]
     
     if len(numeric_cols) > 1:
-        corr_matrix = filtered_df[numeric_cols].corr()
+        # Pearson correlation on a contiguous float32 array (key columns have no missing values after cleaning)
+        corr_values = np.corrcoef(filtered_df[numeric_cols].to_numpy(dtype=np.float32), rowvar=False)
+        corr_matrix = pd.DataFrame(corr_values, index=numeric_cols, columns=numeric_cols)
         
         # Create the heatmap
         fig10 = go.Figure(data=go.Heatmap(
-            z=corr_matrix.values,
+            z=corr_values,
             x=corr_matrix.columns,
             y=corr_matrix.columns,
             colorscale='RdBu_r', # Reversed Red-Blue scale
             zmin=-1,
             zmax=1,
-            text=corr_matrix.values,
-            texttemplate="%{text:.2f}", # Format text to 2 decimal places
+            texttemplate="%{z:.2f}", # Label cells from z (2 decimal places) instead of shipping the matrix twice
             hoverongaps=False
         ))
         fig10.update_layout(title='Correlation Matrix of Key Variables', height=500)
@@ -405,7 +522,7 @@ with tab3:
         - Other correlations are quite weak, suggesting they aren't strong individual predictors.
         """)
 
-with tab4:
+def render_recommendations():
     st.subheader("💡 Key Conclusions & Potential Recommendations")
     
     col1, col2 = st.columns(2)
@@ -413,7 +530,7 @@ with tab4:
     with col1:
         st.markdown("### 🔍 Critical Conclusions")
         
-        avg_cancel_rate = filtered_df['is_canceled'].mean() * 100
+        avg_cancel_rate = kpis['cancel_rate']
         
         st.markdown(f"""
         Based on the data, we've learned a few key things about what makes a booking "risky":
@@ -467,15 +584,15 @@ with tab4:
         📈 Optimize room availability and staff planning.
         """)
 
-with tab5:
+def render_summary():
     st.subheader("📋 Data Summary & Statistics")
     
     st.markdown(f"""
     **Dataset Overview (Based on Filters):**
-    - Total Records: {len(filtered_df):,}
-    - Cancellations: {int(filtered_df['is_canceled'].sum()):,}
-    - Completed Stays: {len(filtered_df) - int(filtered_df['is_canceled'].sum()):,}
-    - **Overall Cancellation Rate: {filtered_df['is_canceled'].mean() * 100:.2f}%**
+    - Total Records: {kpis['bookings']:,}
+    - Cancellations: {kpis['canceled']:,}
+    - Completed Stays: {kpis['completed']:,}
+    - **Overall Cancellation Rate: {kpis['cancel_rate']:.2f}%**
     """)
     
     st.markdown("---")
@@ -491,10 +608,25 @@ with tab5:
         stats_df = filtered_df[existing_cols].describe().transpose()
         stats_df = stats_df[['min', '25%', '50%', 'mean', '75%', 'max']]
         stats_df.columns = ['Min', 'Q1 (25%)', 'Median (50%)', 'Mean', 'Q3 (75%)', 'Max']
-        stats_df = stats_df.applymap(lambda x: f"{x:,.2f}") # Format all numbers
         
         st.markdown("**Numerical Variables Statistics:**")
-        st.dataframe(stats_df, use_container_width=True)
+        # Format on render so the columns stay numeric (and sortable) in the table
+        st.dataframe(stats_df.style.format("{:,.2f}"), use_container_width=True)
+
+# Only the selected view is computed, and switching views reruns just this fragment (not the filters and KPIs)
+@st.fragment
+def render_analysis():
+    views = {
+        "📈 Univariate": render_univariate,
+        "🔄 Bivariate": render_bivariate,
+        "🎯 Multivariate": render_multivariate,
+        "💡 Recommendations": render_recommendations,
+        "📋 Summary": render_summary,
+    }
+    view = st.radio("View", list(views), horizontal=True, label_visibility="collapsed")
+    views[view]()
+
+render_analysis()
 
 st.markdown("---")
 st.markdown("<div style='text-align: center; color: #666; font-size: 12px;'><p>Hotel Booking Cancellation Analysis Dashboard</p></div>", unsafe_allow_html=True)
\ No newline at end of file